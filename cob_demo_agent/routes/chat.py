@@ -3,25 +3,117 @@ FastAPI routes for chatting with the LangGraph agent.
 """
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
 from cob_demo_agent.schemas.chat import ChatRequest, ChatResponse
 from cob_demo_agent.sre.graph_service import get_graph_service
 from cob_demo_agent.utils.errors import classify_exception
 
 router = APIRouter()
 
-@router.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest, svc=Depends(get_graph_service)) -> ChatResponse:
+# The body is parsed by the handler itself, so document it explicitly.
+_CHAT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ChatRequest.model_json_schema()}},
+    }
+}
+
+
+def _parse_chat_request(raw: bytes) -> ChatRequest:
+    """
+    Decode the request body, pulling out only the fields the handler uses.
+
+    Fast path: orjson + targeted key checks, then model_construct() with the
+    already-checked values. Anything unexpected falls back to full Pydantic
+    validation so clients still get FastAPI's standard 422 payload.
+    """
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        data = None
+
+    if isinstance(data, dict):
+        message = data.get("message")
+        thread_id = data.get("thread_id", "default")
+        metadata = data.get("metadata")
+        if (
+            isinstance(message, str) and message
+            and isinstance(thread_id, str)
+            and (metadata is None or isinstance(metadata, dict))
+        ):
+            return ChatRequest.model_construct(message=message, thread_id=thread_id, metadata=metadata)
+
+    try:
+        return ChatRequest.model_validate_json(raw)
+    except ValidationError as exc:
+        # Keep FastAPI's 422 payload shape (locations prefixed with "body").
+        errors = [{**e, "loc": ("body", *e["loc"])} for e in exc.errors(include_url=False)]
+        raise RequestValidationError(errors) from exc
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event frame (JSON data on a single line)."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# Disable proxy buffering (nginx) so tokens reach the client as they are produced.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+# response_model only documents the payload in OpenAPI: the handler returns an
+# ORJSONResponse built from the service dict, so FastAPI skips jsonable_encoder
+# and response revalidation on the hot path.
+@router.post(
+    "/chat",
+    response_model=ChatResponse,
+    response_class=ORJSONResponse,
+    openapi_extra=_CHAT_REQUEST_BODY,
+)
+async def chat(request: Request, svc=Depends(get_graph_service)) -> ORJSONResponse:
     """
     Run one turn of the agent for a given thread_id.
 
     Notes:
-        - Each request is one user message.
-        - Conversation state is retained in-memory via the graph checkpointer.
+        - Each request is one user message (see ChatRequest).
+        - Conversation state is persisted per thread_id by the SQLite checkpointer.
+        - The graph is awaited, so the event loop keeps serving other turns meanwhile.
     """
+    req = _parse_chat_request(await request.body())
     try:
-        out = svc.invoke(req.message, thread_id=req.thread_id)
-        return ChatResponse(**out)
+        out = await svc.ainvoke(req.message, thread_id=req.thread_id)
+        return ORJSONResponse(content=out)
     except Exception as exc:
         info = classify_exception(exc)
-        raise HTTPException(status_code=info.status_code, detail={"error": info.kind, "message": info.message})
+        # Same body shape as HTTPException(detail=...) so clients are unaffected.
+        return ORJSONResponse(
+            status_code=info.status_code,
+            content={"detail": {"error": info.kind, "message": info.message}},
+        )
+
+
+@router.post(
+    "/chat/stream",
+    response_class=StreamingResponse,
+    openapi_extra=_CHAT_REQUEST_BODY,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def chat_stream(request: Request, svc=Depends(get_graph_service)) -> StreamingResponse:
+    """
+    Run one turn of the agent and stream the reply as Server-Sent Events.
+
+    Events:
+        - token: {"text": "..."} reply text, in order
+        - done:  same payload as POST /chat (reply, route, handoff_required, ...)
+        - error: {"error": kind, "message": "..."} (the stream ends after it)
+    """
+    req = _parse_chat_request(await request.body())
+
+    async def events():
+        async for event, data in svc.astream(req.message, thread_id=req.thread_id):
+            yield _sse(event, data)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_SSE_HEADERS)
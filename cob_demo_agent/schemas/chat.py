@@ -19,7 +19,12 @@ class ChatRequest(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Optional client metadata")
 
 class ChatResponse(BaseModel):
-    """Agent response."""
+    """
+    Agent response.
+
+    Documents the /chat payload. The route serializes GraphService's dict as-is,
+    so this model is never instantiated (or revalidated) per request.
+    """
     reply: str = Field(..., description="Assistant reply")
     route: str = Field(..., description="Chosen route (general|kb|booking|handoff)")
     rag_meta_ids: List[str] = Field(default_factory=list, description="Retrieved KB chunk ids (if any)")
@@ -6,7 +6,13 @@ adaptations to work as a real project.
 """
 from __future__ import annotations
 
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from cachetools import TTLCache
 from langchain.tools import tool
 
 from cob_demo_agent.utils.env import get_env
@@ -17,30 +23,114 @@ logger = get_logger("cob_demo_agent.booking_tools")
 
 # Keep the original variable name; allow override via env.
 DB_PATH = get_env("COB_DB_PATH", str(DATA_DIR / "appointments.db"))
+DB_POOL_SIZE = int(get_env("COB_DB_POOL_SIZE", "4") or "4")
+
+# Applied to every pooled connection. WAL lets readers proceed while a booking
+# writes (instead of "database is locked"); synchronous=NORMAL is durable enough
+# in WAL mode for single-statement booking updates.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA mmap_size=268435456;",  # 256 MiB
+    "PRAGMA cache_size=-64000;",  # ~64 MB
+)
 
 # ----------------------------
-# Core DB functions (callable)
+# Connection pool
 # ----------------------------
-def _get_conn():
-    """Create a SQLite connection (simple helper)."""
-    return sqlite3.connect(DB_PATH)
+class _ConnectionPool:
+    """
+    Small fixed-size pool of SQLite connections.
+
+    Connections are opened lazily (up to `size`) and reused across tool calls, so
+    each call skips connect()/close() and keeps SQLite's page cache warm. Idle
+    connections are handed out most-recently-used first: back-to-back tool calls
+    in one booking turn keep reusing the same hot connection. A connection is
+    only ever used by one thread at a time, which is what makes
+    check_same_thread=False safe here.
+    """
 
+    def __init__(self, path: str, size: int) -> None:
+        self._path = path
+        self._size = max(1, size)
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=self._size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _take(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self._size:
+                conn = self._connect()
+                self._opened += 1
+                return conn
+        # Pool exhausted: wait for another tool call to hand one back.
+        return self._idle.get()
+
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; uncommitted work is rolled back on error."""
+        conn = self._take()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+
+_pool = _ConnectionPool(DB_PATH, DB_POOL_SIZE)
+
+# Short-lived cache of free times keyed by (service, date). The booking agent's
+# tool loop tends to list the same day several times within one turn; a
+# successful booking invalidates the affected key.
+SLOTS_CACHE_TTL = float(get_env("COB_SLOTS_CACHE_TTL", "5") or "5")
+_slots_cache: TTLCache[tuple[str, str], tuple[str, ...]] = TTLCache(maxsize=1024, ttl=SLOTS_CACHE_TTL)
+_slots_cache_lock = threading.Lock()
+
+
+def _invalidate_slots(service: str, date: str) -> None:
+    with _slots_cache_lock:
+        _slots_cache.pop((service, date), None)
 
+# ----------------------------
+# Core DB functions (callable)
+# ----------------------------
 def core_list_available_slots(service: str, date: str) -> list[str]:
     """Return available times (HH:MM) for a given service and date."""
-    conn = _get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT time FROM appointments
-        WHERE service=? AND date=? AND status='free'
-        ORDER BY time ASC;
-        """,
-        (service, date),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return [r[0] for r in rows]
+    key = (service, date)
+    with _slots_cache_lock:
+        cached = _slots_cache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    with _pool.acquire() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT time FROM appointments
+            WHERE service=? AND date=? AND status='free'
+            ORDER BY time ASC;
+            """,
+            (service, date),
+        )
+        rows = cur.fetchall()
+
+    times = tuple(r[0] for r in rows)
+    with _slots_cache_lock:
+        _slots_cache[key] = times
+    return list(times)
 
 
 def core_check_slot_availability(service: str, date: str, time: str) -> str:
@@ -48,17 +138,16 @@ def core_check_slot_availability(service: str, date: str, time: str) -> str:
     Check if the slot exists and is free.
     Returns: "available", "booked", or "not_found"
     """
-    conn = _get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT status FROM appointments
-        WHERE service=? AND date=? AND time=?;
-        """,
-        (service, date, time),
-    )
-    row = cur.fetchone()
-    conn.close()
+    with _pool.acquire() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT status FROM appointments
+            WHERE service=? AND date=? AND time=?;
+            """,
+            (service, date, time),
+        )
+        row = cur.fetchone()
 
     if row is None:
         return "not_found"
@@ -67,30 +156,43 @@ def core_check_slot_availability(service: str, date: str, time: str) -> str:
 
 def core_book_slot(service: str, date: str, time: str, customer_name: str, phone: str) -> str:
     """Book slot using an atomic update. Returns a human-readable result."""
-    conn = _get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE appointments
-        SET status='booked',
-            customer_name=?,
-            phone=?,
-            created_at=datetime('now')
-        WHERE service=? AND date=? AND time=? AND status='free';
-        """,
-        (customer_name, phone, service, date, time),
-    )
-
-    conn.commit()
-    updated = cur.rowcount
-    conn.close()
+    with _pool.acquire() as conn:
+        cur = conn.cursor()
+
+        cur.execute(
+            """
+            UPDATE appointments
+            SET status='booked',
+                customer_name=?,
+                phone=?,
+                created_at=datetime('now')
+            WHERE service=? AND date=? AND time=? AND status='free';
+            """,
+            (customer_name, phone, service, date, time),
+        )
+
+        updated = cur.rowcount
+
+        row = None
+        if updated != 1:
+            # Distinguish booked vs not_found on the same connection/transaction.
+            cur.execute(
+                """
+                SELECT status FROM appointments
+                WHERE service=? AND date=? AND time=?;
+                """,
+                (service, date, time),
+            )
+            row = cur.fetchone()
+
+        conn.commit()
 
     if updated == 1:
+        _invalidate_slots(service, date)
         return "success"
-    # distinguish between booked and not_found
-    status = core_check_slot_availability(service, date, time)
-    if status == "booked":
+    if row is not None and row[0] != "free":
+        # Taken by someone else: a cached listing may still show it as free.
+        _invalidate_slots(service, date)
         return "booked"
     return "not_found"
 
@@ -7,8 +7,12 @@ Important:
 """
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Final, List, Optional, Set, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
 
 from cob_demo_agent.sre.log_manager.logger import get_logger
 from cob_demo_agent.utils.errors import classify_exception
@@ -16,15 +20,112 @@ from cob_demo_agent.utils.env import get_env
 
 logger = get_logger("cob_demo_agent.graph_service")
 
+# Bounded retries for transient errors (quota/timeouts)
+MAX_RETRIES: Final[int] = int(get_env("COB_MAX_RETRIES", "1") or "1")
+
 _GRAPH_SERVICE_SINGLETON = None
+_GRAPH_SERVICE_LOCK = asyncio.Lock()
 
-def get_graph_service():
-    """FastAPI dependency that returns a singleton GraphService."""
+async def get_graph_service():
+    """FastAPI dependency that returns a singleton GraphService (SQLite checkpointer)."""
     global _GRAPH_SERVICE_SINGLETON
     if _GRAPH_SERVICE_SINGLETON is None:
-        _GRAPH_SERVICE_SINGLETON = GraphService()
+        async with _GRAPH_SERVICE_LOCK:
+            if _GRAPH_SERVICE_SINGLETON is None:
+                from cob_demo_agent.sre.langgraph_app import build_checkpointer
+                checkpointer = await build_checkpointer()
+                try:
+                    # build_app() is blocking (Chroma init, KB indexing/embedding calls):
+                    # keep it off the event loop so other requests are still served.
+                    _GRAPH_SERVICE_SINGLETON = await asyncio.to_thread(GraphService, checkpointer=checkpointer)
+                except Exception:
+                    await checkpointer.conn.close()
+                    raise
     return _GRAPH_SERVICE_SINGLETON
 
+async def close_graph_service() -> None:
+    """Release the singleton's checkpointer connection (app shutdown)."""
+    global _GRAPH_SERVICE_SINGLETON
+    svc, _GRAPH_SERVICE_SINGLETON = _GRAPH_SERVICE_SINGLETON, None
+    if svc is not None:
+        await svc.aclose()
+
+
+def _content_text(content: Any) -> str:
+    """
+    Plain text of a message's content.
+
+    Content is usually a str, but some providers (e.g. Gemini) return a list of
+    content blocks; keep the text parts so `reply` is always a str.
+    """
+    if isinstance(content, str):
+        return content
+    if not content:
+        return ""
+    return "".join(
+        b if isinstance(b, str) else b.get("text", "")
+        for b in content
+        if isinstance(b, str) or (isinstance(b, dict) and b.get("type") == "text")
+    )
+
+
+class _ReplyBuffer:
+    """
+    Releases streamed AI text only once its message is known to be a reply.
+
+    A tool-calling response can stream text ("Let me check availability...")
+    before its tool call, so chunk text is held per message id and dropped if
+    the message turns out to call tools. Structured-output calls carry their
+    payload in tool calls too, so they never release anything; nodes that
+    build the reply themselves (router/rag/handoff) arrive as one AIMessage.
+    """
+
+    __slots__ = ("_id", "_parts", "_done")
+
+    def __init__(self) -> None:
+        self._id: Optional[str] = None  # message id currently being buffered
+        self._parts: List[str] = []
+        self._done: Set[str] = set()  # ids already released or dropped
+
+    def feed(self, msg: Any) -> str:
+        """Take one streamed message/chunk; return text that is now safe to send."""
+        if not isinstance(msg, (AIMessage, AIMessageChunk)):
+            return ""
+
+        if not isinstance(msg, AIMessageChunk):
+            # A complete message: release anything pending, then this one.
+            out = self.flush()
+            if msg.id in self._done or msg.tool_calls:
+                return out
+            if msg.id is not None:
+                self._done.add(msg.id)
+            return out + _content_text(msg.content)
+
+        out = self.flush() if msg.id != self._id else ""
+        self._id = msg.id
+        if msg.id in self._done:
+            return out
+        if msg.tool_call_chunks or msg.tool_calls:
+            # Tool-calling step: its text is internal, drop it.
+            self._parts.clear()
+            self._done.add(msg.id)
+            return out
+        text = _content_text(msg.content)
+        if text:
+            self._parts.append(text)
+        if getattr(msg, "chunk_position", None) == "last":
+            out += self.flush()
+        return out
+
+    def flush(self) -> str:
+        """Release the text held for the current message (it finished without tool calls)."""
+        text = "" if self._id in self._done else "".join(self._parts)
+        if self._id is not None:
+            self._done.add(self._id)
+        self._parts.clear()
+        self._id = None
+        return text
+
 
 class GraphService:
     """
@@ -36,17 +137,56 @@ class GraphService:
     - normalized output for API responses
     """
 
-    def __init__(self) -> None:
+    def __init__(self, checkpointer: Any = None) -> None:
         from cob_demo_agent.sre.langgraph_app import build_app  # local import to avoid heavy import at module load
-        self._app = build_app()
+        self._checkpointer = checkpointer
+        self._app = build_app(checkpointer)
+        self._max_retries = MAX_RETRIES
+
+    async def aclose(self) -> None:
+        """Close the checkpointer connection, if it holds one."""
+        conn = getattr(self._checkpointer, "conn", None)
+        if conn is not None:
+            await conn.close()
 
-        # Bounded retries for transient errors (quota/timeouts)
-        self._max_retries = int(get_env("COB_MAX_RETRIES", "1") or "1")
+    @staticmethod
+    def _config(thread_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": thread_id}, "recursion_limit": 20}
 
     def invoke(self, message: str, thread_id: str = "default") -> Dict[str, Any]:
+        """
+        Invoke the graph for a single user message (blocking).
+
+        Graph nodes are async, so this drives ainvoke() on a fresh event loop. It is
+        meant for plain scripts only. Code already running in an event loop (the
+        API, Jupyter/IPython notebooks) must use `await svc.ainvoke(...)` instead.
+
+        Args:
+            message: The user message text.
+            thread_id: Conversation id (checkpointer key).
+
+        Returns:
+            Dict containing reply + metadata used by ChatResponse.
+
+        Raises:
+            RuntimeError: If called while an event loop is running.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.ainvoke(message, thread_id=thread_id))
+        raise RuntimeError(
+            "GraphService.invoke() cannot run inside an event loop "
+            "(e.g. a notebook); use `await svc.ainvoke(...)` instead."
+        )
+
+    async def ainvoke(self, message: str, thread_id: str = "default") -> Dict[str, Any]:
         """
         Invoke the graph for a single user message.
 
+        The graph runs on the event loop, so concurrent chat turns overlap while
+        upstream LLM calls are in flight instead of each holding a worker thread.
+
         Args:
             message: The user message text.
             thread_id: Conversation id (checkpointer key).
@@ -54,15 +194,16 @@ class GraphService:
         Returns:
             Dict containing reply + metadata used by ChatResponse.
         """
-        cfg = {"configurable": {"thread_id": thread_id}, "recursion_limit": 20}
+        cfg = self._config(thread_id)
 
         start = time.time()
-        logger.info(f"[invoke] thread_id={thread_id} message={message[:200]!r}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[invoke] thread_id=%s message=%r", thread_id, message[:200])
 
         last_exc: Optional[Exception] = None
         for attempt in range(self._max_retries + 1):
             try:
-                state = self._app.invoke(
+                state = await self._app.ainvoke(
                     {"messages": [{"role": "user", "content": message}]},
                     cfg,
                 )
@@ -70,24 +211,82 @@ class GraphService:
             except Exception as exc:
                 last_exc = exc
                 info = classify_exception(exc)
-                logger.exception(f"[invoke_error] attempt={attempt} kind={info.kind} raw={info.raw}")
+                logger.exception("[invoke_error] attempt=%s kind=%s raw=%s", attempt, info.kind, info.raw)
                 if not info.retryable or attempt >= self._max_retries:
                     raise
-                # small backoff
-                time.sleep(0.5 * (attempt + 1))
+                # small backoff (non-blocking)
+                await asyncio.sleep(0.5 * (attempt + 1))
         else:
             raise last_exc  # pragma: no cover
 
-        elapsed = (time.time() - start) * 1000
-        logger.info(f"[invoke_done] thread_id={thread_id} elapsed_ms={elapsed:.1f}")
+        logger.info("[invoke_done] thread_id=%s elapsed_ms=%.1f", thread_id, (time.time() - start) * 1000)
+
+        return self._normalize(state)
+
+    async def astream(self, message: str, thread_id: str = "default") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run a single user message and yield reply text as it is generated.
+
+        Yields ("token", {"text": ...}) for each piece of user-facing reply text,
+        then one terminal event: ("done", <same dict as ainvoke>) or
+        ("error", {"error": kind, "message": ...}). Text is released per finished
+        AI message (see _ReplyBuffer), so internal tool-calling steps never show
+        up as tokens. Retries follow ainvoke(), but only while nothing has been
+        yielded yet.
+
+        Args:
+            message: The user message text.
+            thread_id: Conversation id (checkpointer key).
+        """
+        cfg = self._config(thread_id)
+
+        start = time.time()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[stream] thread_id=%s message=%r", thread_id, message[:200])
+
+        sent = False
+        for attempt in range(self._max_retries + 1):
+            try:
+                buf = _ReplyBuffer()
+                async for msg, _meta in self._app.astream(
+                    {"messages": [{"role": "user", "content": message}]},
+                    cfg,
+                    stream_mode="messages",
+                ):
+                    text = buf.feed(msg)
+                    if text:
+                        sent = True
+                        yield "token", {"text": text}
+                text = buf.flush()
+                if text:
+                    sent = True
+                    yield "token", {"text": text}
+                snapshot = await self._app.aget_state(cfg)
+                break
+            except Exception as exc:
+                info = classify_exception(exc)
+                logger.exception("[stream_error] attempt=%s kind=%s raw=%s", attempt, info.kind, info.raw)
+                if sent or not info.retryable or attempt >= self._max_retries:
+                    yield "error", {"error": info.kind, "message": info.message}
+                    return
+                await asyncio.sleep(0.5 * (attempt + 1))
+
+        logger.info("[stream_done] thread_id=%s elapsed_ms=%.1f", thread_id, (time.time() - start) * 1000)
+
+        yield "done", self._normalize(snapshot.values)
 
-        # Normalize response from state
+    @staticmethod
+    def _normalize(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize the final graph state into the API response dict."""
         messages = state.get("messages", [])
         reply = ""
         if messages:
             # last message is expected to be AIMessage, but keep it generic
             last = messages[-1]
-            reply = getattr(last, "content", "") or ""
+            if isinstance(last, AIMessage):
+                reply = _content_text(last.content)
+            else:
+                reply = _content_text(getattr(last, "content", ""))
 
         route = state.get("route", "general")
         rag_meta_ids = state.get("rag_meta_ids", []) or []
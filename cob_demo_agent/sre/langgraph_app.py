@@ -11,21 +11,31 @@ We aim to preserve the notebook's logic, while adding:
 - safe config via env vars
 - structured logging around node execution
 - bounded tool loops (if present in notebook)
+
+Nodes are async: LLM, retriever and tool calls are awaited, so many graph runs can
+overlap on one event loop. Use `app.ainvoke(...)` (sync `invoke` is not supported).
 """
 from __future__ import annotations
 
-from typing import Annotated, Literal, Dict, Any, Optional, List
+import logging
+from typing import Annotated, Final, Literal, Dict, Any, Optional, List
 from typing_extensions import TypedDict
 
+import aiosqlite
+import orjson
+
 from cob_demo_agent.sre.log_manager.logger import get_logger
 from cob_demo_agent.utils.env import get_env
+from cob_demo_agent.utils.paths import DATA_DIR
 
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import AnyMessage, HumanMessage, AIMessage, SystemMessage
 
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.prebuilt import ToolNode
 
 from cob_demo_agent.sre.booking_agent.tools import list_available_slots, check_slot_availability, book_slot
@@ -35,9 +45,33 @@ from cob_demo_agent.sre.rag_agent.prompts import ROUTER_PROMPT, RAG_PROMPT, BOOK
 
 logger = get_logger("cob_demo_agent.langgraph_app")
 
+# Conversation checkpoints (shared by all API workers on this host).
+CHECKPOINT_DB_PATH = get_env("COB_CHECKPOINT_DB_PATH", str(DATA_DIR / "checkpoints.db"))
+
+# Model settings and loop bounds, resolved once at import (API keys stay in build_app).
+_DEFAULT_MODEL = "google_genai:gemini-flash-latest"
+ROUTER_MODEL: Final[str] = get_env("COB_ROUTER_MODEL", _DEFAULT_MODEL) or _DEFAULT_MODEL
+ROUTER_TEMP: Final[float] = float(get_env("COB_ROUTER_TEMP", "1") or "1")
+RAG_MODEL: Final[str] = get_env("COB_RAG_MODEL", _DEFAULT_MODEL) or _DEFAULT_MODEL
+RAG_TEMP: Final[float] = float(get_env("COB_RAG_TEMP", "0") or "0")
+BOOKING_MODEL: Final[str] = get_env("COB_BOOKING_MODEL", _DEFAULT_MODEL) or _DEFAULT_MODEL
+BOOKING_TEMP: Final[float] = float(get_env("COB_BOOKING_TEMP", "0.2") or "0.2")
+HANDOFF_MODEL: Final[str] = get_env("COB_HANDOFF_MODEL", _DEFAULT_MODEL) or _DEFAULT_MODEL
+HANDOFF_TEMP: Final[float] = float(get_env("COB_HANDOFF_TEMP", "1") or "1")
+MAX_TOOL_STEPS: Final[int] = int(get_env("COB_MAX_TOOL_STEPS", "4") or "4")
+
 # Tools list (kept same semantics)
 BOOKING_TOOLS = [list_available_slots, check_slot_availability, book_slot]
 
+# Static system prompts, built once instead of per LLM turn.
+_ROUTER_SYS = SystemMessage(content=ROUTER_PROMPT)
+_RAG_SYS = SystemMessage(content=RAG_PROMPT)
+_BOOKING_SYS = SystemMessage(content=BOOKING_PROMPT)
+_HANDOFF_SYS = SystemMessage(content=HANDOFF_PROMPT or ROUTER_PROMPT)
+
+# rag_node reply when retrieval finds nothing (the LLM call is skipped).
+RAG_NO_CONTEXT_REPLY = "I couldn't find relevant information in the knowledge base."
+
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
     route: Literal["general", "kb", "booking", "handoff"]
@@ -49,29 +83,49 @@ class State(TypedDict):
     repeat_tool_count: int
 
 def _wrap_node(name: str, fn):
-    """Log entry/exit for a node without changing its behavior."""
-    def _inner(state: State):
+    """Log entry/exit for an async node without changing its behavior."""
+    async def _inner(state: State):
         try:
-            last = state["messages"][-1] if state.get("messages") else None
-            last_type = type(last).__name__ if last is not None else "None"
-            last_preview = (getattr(last, "content", "") or "")[:200] if last is not None else ""
-            logger.info(f"[node_enter] {name} last_type={last_type} last={last_preview!r}")
-            out = fn(state)
+            # Only build the preview when INFO is actually emitted.
+            if logger.isEnabledFor(logging.INFO):
+                last = state["messages"][-1] if state.get("messages") else None
+                last_type = type(last).__name__ if last is not None else "None"
+                last_preview = (getattr(last, "content", "") or "")[:200] if last is not None else ""
+                logger.info("[node_enter] %s last_type=%s last=%r", name, last_type, last_preview)
+            out = await fn(state)
             # Log route/tool hints
-            route = out.get("route", state.get("route"))
-            logger.info(f"[node_exit] {name} route={route!r} keys={list(out.keys())}")
+            if logger.isEnabledFor(logging.INFO):
+                route = out.get("route", state.get("route"))
+                logger.info("[node_exit] %s route=%r keys=%s", name, route, list(out.keys()))
             return out
         except Exception:
-            logger.exception(f"[node_error] {name}")
+            logger.exception("[node_error] %s", name)
             raise
     return _inner
 
-def build_app():
+async def build_checkpointer() -> AsyncSqliteSaver:
+    """
+    Open the persistent SQLite checkpointer (WAL mode).
+
+    Unlike InMemorySaver, state lives on disk: memory stays bounded and every
+    uvicorn worker sees the same threads. Must be awaited on the event loop
+    that runs the graph.
+    """
+    conn = await aiosqlite.connect(CHECKPOINT_DB_PATH)
+    await conn.execute("PRAGMA journal_mode=WAL;")
+    await conn.execute("PRAGMA synchronous=NORMAL;")
+    return AsyncSqliteSaver(conn)
+
+def build_app(checkpointer: Optional[BaseCheckpointSaver] = None):
     """
     Build and compile the LangGraph app.
 
+    Args:
+        checkpointer: Conversation state store (see build_checkpointer()).
+            Defaults to an in-memory saver for scripts/notebooks.
+
     Returns:
-        Compiled graph app with an in-memory checkpointer.
+        Compiled graph app.
     """
     api_key = get_env("GOOGLE_API_KEY", required=True)
     router_llm_api_key = get_env("ROUTER_API_KEY", required=True)
@@ -81,26 +135,26 @@ def build_app():
 
     # LLMs (ported settings)
     router_llm = init_chat_model(
-        model=get_env("COB_ROUTER_MODEL", "google_genai:gemini-flash-latest"),
-        temperature=float(get_env("COB_ROUTER_TEMP", "1") or "1"),
+        model=ROUTER_MODEL,
+        temperature=ROUTER_TEMP,
         api_key=router_llm_api_key,
     ).with_structured_output(RouterDecision, method="function_calling")
 
     rag_llm_tools = init_chat_model(
-        model=get_env("COB_RAG_MODEL", "google_genai:gemini-flash-latest"),
-        temperature=float(get_env("COB_RAG_TEMP", "0") or "0"),
+        model=RAG_MODEL,
+        temperature=RAG_TEMP,
         api_key=rag_llm_tools_api_key,
     ).with_structured_output(StructuredResponseRAG, method="function_calling")
 
     booking_llm = init_chat_model(
-        model=get_env("COB_BOOKING_MODEL", "google_genai:gemini-flash-latest"),
-        temperature=float(get_env("COB_BOOKING_TEMP", "0.2") or "0.2"),
+        model=BOOKING_MODEL,
+        temperature=BOOKING_TEMP,
         api_key=booking_llm_api_key,
     ).bind_tools(BOOKING_TOOLS)
 
     handoff_llm = init_chat_model(
-        model=get_env("COB_HANDOFF_MODEL", "google_genai:gemini-flash-latest"),
-        temperature=float(get_env("COB_HANDOFF_TEMP", "1") or "1"),
+        model=HANDOFF_MODEL,
+        temperature=HANDOFF_TEMP,
         api_key=handoff_llm_api_key,
     ).with_structured_output(HandoffDecision, method="function_calling")
 
@@ -109,13 +163,12 @@ def build_app():
     # ----------------------------
     # Node functions (ported logic)
     # ----------------------------
-    def router_node(state: State) -> State:
+    async def router_node(state: State) -> State:
         last_user = state["messages"][-1]
         if not isinstance(last_user, HumanMessage):
             return state
 
-        router_system = SystemMessage(content=ROUTER_PROMPT)
-        decision: RouterDecision = router_llm.invoke([router_system] + state["messages"])
+        decision: RouterDecision = await router_llm.ainvoke([_ROUTER_SYS] + state["messages"])
 
         # Confidence guard (not keyword rules): if unsure, ask one question in general route
         if decision.confidence < 0.55 and decision.route != "general":
@@ -144,19 +197,24 @@ def build_app():
             return "handoff_node"
         return END
 
-    def rag_node(state: State) -> State:
+    async def rag_node(state: State) -> State:
         query = state["messages"][-1].content
 
         # 1. Retrieve first (no LLM)
-        kb_context = retriever.invoke(query)
+        kb_context = await retriever.ainvoke(query)
+        if not kb_context:
+            # Nothing to ground an answer on: skip the LLM round-trip.
+            return {
+                "messages": [AIMessage(content=RAG_NO_CONTEXT_REPLY, additional_kwargs={"rag_meta_ids": []})],
+                "rag_meta_ids": [],
+            }
 
         # 2. Build prompt + messages
-        ctx_text = "\n\n".join([d.page_content for d in kb_context]) if kb_context else ""
-        system = SystemMessage(content=RAG_PROMPT)
-        msgs = [system] + state["messages"] + [SystemMessage(content=f"KB_CONTEXT:\n{ctx_text}")]
+        ctx_text = "\n\n".join([d.page_content for d in kb_context])
+        msgs = [_RAG_SYS] + state["messages"] + [SystemMessage(content=f"KB_CONTEXT:\n{ctx_text}")]
 
         # 3. Single LLM call
-        ai_structured_response = rag_llm_tools.invoke(msgs)
+        ai_structured_response = await rag_llm_tools.ainvoke(msgs)
 
         # Extract chunk ids safely
         rag_meta_ids = [m.id for m in ai_structured_response.meta if m.id]
@@ -172,15 +230,14 @@ def build_app():
             "rag_meta_ids": rag_meta_ids,
         }
 
-    def booking_llm_node(state: State) -> State:
-        booking_system = SystemMessage(content=BOOKING_PROMPT)
-        ai = booking_llm.invoke([booking_system] + state["messages"])
+    async def booking_llm_node(state: State) -> State:
+        ai = await booking_llm.ainvoke([_BOOKING_SYS] + state["messages"])
 
         sig = ""
         if isinstance(ai, AIMessage) and getattr(ai, "tool_calls", None):
             tc = ai.tool_calls[0]
-            import json
-            sig = tc["name"] + "|" + json.dumps(tc.get("args", {}), sort_keys=True)
+            # Canonical (key-sorted) args so identical calls compare equal.
+            sig = tc["name"] + "|" + orjson.dumps(tc.get("args", {}), option=orjson.OPT_SORT_KEYS).decode()
 
         repeats = state.get("repeat_tool_count", 0)
         if sig and sig == state.get("last_tool_signature"):
@@ -194,32 +251,28 @@ def build_app():
             "repeat_tool_count": repeats,
         }
 
-    MAX_TOOL_STEPS = int(get_env("COB_MAX_TOOL_STEPS", "4") or "4")
-
     def booking_should_continue(state: State) -> str:
-        if state.get("booking_tool_steps", 0) >= MAX_TOOL_STEPS:
+        # Cheapest check first: most hops end because the reply has no tool calls.
+        if not getattr(state["messages"][-1], "tool_calls", None):
+            return "end"
+        # Stop at the step budget, or if repeating the same tool call too many times
+        if state.get("booking_tool_steps", 0) >= MAX_TOOL_STEPS or state.get("repeat_tool_count", 0) >= 2:
             return "end"
-        last = state["messages"][-1]
-        if isinstance(last, AIMessage) and getattr(last, "tool_calls", None):
-            # Stop if repeating the same tool call too many times
-            if state.get("repeat_tool_count", 0) >= 2:
-                return "end"
-            return "continue"
-        return "end"
+        return "continue"
 
     tool_node = ToolNode(tools=BOOKING_TOOLS)
 
-    def tools_wrapper(state: State) -> State:
-        out = tool_node.invoke(state)
+    async def tools_wrapper(state: State) -> State:
+        # Sync SQLite tools are run in a worker thread by ToolNode.
+        out = await tool_node.ainvoke(state)
         return {**out, "booking_tool_steps": state.get("booking_tool_steps", 0) + 1}
 
-    def handoff_node(state: State) -> State:
+    async def handoff_node(state: State) -> State:
         last_user = state["messages"][-1]
         if not isinstance(last_user, HumanMessage):
             return state
 
-        router_system = SystemMessage(content=HANDOFF_PROMPT or ROUTER_PROMPT)
-        decision: HandoffDecision = handoff_llm.invoke([router_system] + state["messages"])
+        decision: HandoffDecision = await handoff_llm.ainvoke([_HANDOFF_SYS] + state["messages"])
 
         return {
             "handoff_required": bool(decision.handoff_required),
@@ -251,6 +304,7 @@ def build_app():
     builder.add_edge("rag_node", END)
     builder.add_edge("handoff_node", END)
 
-    checkpointer = InMemorySaver()
+    if checkpointer is None:
+        checkpointer = InMemorySaver()
     app = builder.compile(checkpointer=checkpointer)
     return app
@@ -11,10 +11,13 @@ Environment:
 from __future__ import annotations
 
 import json
+from array import array
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 
@@ -29,6 +32,35 @@ PERSIST_DIR = get_env("COB_PERSIST_DIR", str(DATA_DIR / "chroma_langchain_db"))
 COLLECTION_NAME = get_env("COB_COLLECTION_NAME", "cob_kb")
 KB_JSON_PATH = get_env("COB_KB_JSON_PATH", str(DATA_DIR / "cob_kb.json"))
 
+# Documents per add_documents() call when indexing (bounds each embedding request).
+INDEX_BATCH_SIZE = 100
+
+# Query embeddings kept in memory (one ~24 KB float64 vector per distinct query).
+QUERY_EMBED_CACHE_SIZE = int(get_env("COB_QUERY_EMBED_CACHE_SIZE", "1024") or "1024")
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with a bounded LRU cache for embed_query().
+
+    Every KB question is embedded remotely before the Chroma lookup; repeated
+    questions now skip that HTTP round-trip. Document embeddings (indexing) are
+    passed through uncached.
+    """
+
+    def __init__(self, inner: Embeddings, maxsize: int = QUERY_EMBED_CACHE_SIZE) -> None:
+        self._inner = inner
+        self._cached_query = lru_cache(maxsize=maxsize)(self._embed_query_uncached)
+
+    def _embed_query_uncached(self, text: str) -> array:
+        # Packed array: far smaller than a list of Python floats, and immutable to callers.
+        return array("d", self._inner.embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._cached_query(text).tolist()
+
 def _load_kb_items(path: str) -> List[Dict[str, Any]]:
     p = Path(path)
     if not p.exists():
@@ -76,10 +108,13 @@ def ensure_kb_indexed(vector_store: Chroma) -> None:
         return
 
     logger.info(f"Indexing KB docs into Chroma: n={len(docs)}")
-    vector_store.add_documents(docs)
+    for start in range(0, len(docs), INDEX_BATCH_SIZE):
+        batch = docs[start:start + INDEX_BATCH_SIZE]
+        vector_store.add_documents(batch)
+        logger.info(f"Indexed KB batch: {start + len(batch)}/{len(docs)}")
 
-def build_retriever():
-    """Create embeddings, Chroma vector store and return a retriever."""
+def build_vector_store() -> Chroma:
+    """Create embeddings and the Chroma vector store, indexing the KB if it is empty."""
     api_key = get_env("GOOGLE_API_KEY", required=True)
 
     embeddings = GoogleGenerativeAIEmbeddings(
@@ -89,11 +124,16 @@ def build_retriever():
 
     vector_store = Chroma(
         collection_name=COLLECTION_NAME,
-        embedding_function=embeddings,
+        embedding_function=CachedQueryEmbeddings(embeddings),
         persist_directory=PERSIST_DIR,
     )
 
     ensure_kb_indexed(vector_store)
+    return vector_store
+
+def build_retriever():
+    """Create embeddings, Chroma vector store and return a retriever."""
+    vector_store = build_vector_store()
 
     retriever = vector_store.as_retriever(
         search_type="similarity",
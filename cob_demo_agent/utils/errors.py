@@ -6,9 +6,15 @@ can respond consistently.
 """
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from typing import Optional
 
+# Keyword patterns per category (case-insensitive), checked in priority order.
+_QUOTA_RE = re.compile(r"resource exhausted|quota|rate limit|429", re.IGNORECASE)
+_TRANSIENT_RE = re.compile(r"timeout|timed out|temporarily unavailable|503", re.IGNORECASE)
+_BAD_REQUEST_RE = re.compile(r"invalid|bad request|400", re.IGNORECASE)
+
 @dataclass
 class ErrorInfo:
     """Normalized error info."""
@@ -29,10 +35,9 @@ def classify_exception(exc: Exception) -> ErrorInfo:
         ErrorInfo
     """
     msg = str(exc)
-    low = msg.lower()
 
     # Quota / rate limit / resource exhausted
-    if "resource exhausted" in low or "quota" in low or "rate limit" in low or "429" in low:
+    if _QUOTA_RE.search(msg):
         return ErrorInfo(
             kind="MODEL_QUOTA_EXCEEDED",
             message="Model quota/rate limit exceeded. Please retry later.",
@@ -42,7 +47,7 @@ def classify_exception(exc: Exception) -> ErrorInfo:
         )
 
     # Timeouts / transient network
-    if "timeout" in low or "timed out" in low or "temporarily unavailable" in low or "503" in low:
+    if _TRANSIENT_RE.search(msg):
         return ErrorInfo(
             kind="TRANSIENT_UPSTREAM_ERROR",
             message="Upstream service temporarily unavailable. Please retry.",
@@ -52,7 +57,7 @@ def classify_exception(exc: Exception) -> ErrorInfo:
         )
 
     # Bad request / validation at provider side
-    if "invalid" in low or "bad request" in low or "400" in low:
+    if _BAD_REQUEST_RE.search(msg):
         return ErrorInfo(
             kind="UPSTREAM_BAD_REQUEST",
             message="Upstream rejected the request (invalid input/config).",
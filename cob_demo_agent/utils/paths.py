@@ -6,16 +6,27 @@ but these helpers provide sensible defaults for a real project layout.
 """
 from __future__ import annotations
 
+import os.path as _op
+from os import makedirs as _makedirs
 from pathlib import Path
 from .env import get_env
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]  # .../cob_demo_agent
-PACKAGE_ROOT = Path(__file__).resolve().parents[1]  # .../cob_demo_agent/cob_demo_agent
+# os.path.abspath is pure string work; Path.resolve() would realpath() every
+# component on import, once per worker process.
+_UTILS_DIR = _op.dirname(_op.abspath(__file__))
+PACKAGE_ROOT = Path(_op.dirname(_UTILS_DIR))  # .../cob_demo_agent/cob_demo_agent
+PROJECT_ROOT = PACKAGE_ROOT.parent  # .../cob_demo_agent
 
-LOGS_DIR = Path(get_env("COB_LOGS_DIR", str(PROJECT_ROOT / "logs"))).resolve()
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
-DATA_DIR = Path(get_env("COB_DATA_DIR", str(PROJECT_ROOT / "data"))).resolve()
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+def _ensure_dir(path: str) -> Path:
+    """Absolute Path for `path`, created if missing (no mkdir call when it exists)."""
+    path = _op.abspath(path)
+    if not _op.isdir(path):
+        _makedirs(path, exist_ok=True)
+    return Path(path)
+
+
+LOGS_DIR = _ensure_dir(get_env("COB_LOGS_DIR", str(PROJECT_ROOT / "logs")))
+DATA_DIR = _ensure_dir(get_env("COB_DATA_DIR", str(PROJECT_ROOT / "data")))
 
 PROMPTS_DIR = PACKAGE_ROOT / "prompts"
@@ -3,35 +3,126 @@ FastAPI entrypoint.
 
 Run:
   uvicorn main_api:app --reload
+  python main_api.py          # N workers, uvloop + httptools (see main())
 """
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
-from cob_demo_agent.sre.log_manager.logger import setup_logging
+from cob_demo_agent.sre.log_manager.logger import get_logger, setup_logging
+from cob_demo_agent.sre.graph_service import close_graph_service, get_graph_service
 from cob_demo_agent.routes.chat import router as chat_router
+from cob_demo_agent.utils.env import get_env
 
 # Initialize logging as early as possible
 setup_logging()
 
+logger = get_logger("cob_demo_agent.api")
+
+# Worker threads for blocking work awaited from async code. All endpoints are async,
+# so the threads that matter are the event loop's default executor: sync booking
+# tools (ToolNode), the Chroma retriever and GraphService init all run there via
+# run_in_executor/to_thread. AnyIO's limiter (sync endpoints/dependencies, none
+# today) gets the same size.
+THREADPOOL_SIZE = int(get_env("COB_THREADPOOL", "100") or "100")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the threadpools and warm the graph service before serving traffic."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREADPOOL_SIZE, thread_name_prefix="cob-worker")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    try:
+        await get_graph_service()
+    except Exception:
+        # Keep the API up (health checks, clear errors); the first request retries init.
+        logger.exception("[startup] graph service warm-up failed")
+    yield
+    await close_graph_service()
+
 app = FastAPI(
     title="COB Demo Agent API",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS (adjust as needed)
+# Compress larger JSON replies (LLM answers are often multi-KB).
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# CORS: only configured origins (comma-separated). Added last so it is the
+# outermost middleware and answers preflight requests before anything else.
+CORS_ORIGINS = [o.strip() for o in (get_env("COB_CORS_ORIGINS", "http://localhost:8501") or "").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-@app.get("/health")
-def health():
-    """Simple health check."""
-    return {"status": "ok"}
+# One prebuilt response: no per-probe serialization or allocation. Safe to share:
+# middleware copies the header list before modifying it.
+_HEALTH_OK = PlainTextResponse(b"ok")
+
+@app.get("/health", include_in_schema=False)
+async def health() -> PlainTextResponse:
+    """Simple health check (plain-text "ok"; async, so no threadpool hop)."""
+    return _HEALTH_OK
 
 app.include_router(chat_router, prefix="/api")
+
+def _fast_or_auto(impl: str) -> str:
+    """Pick a C-backed uvicorn implementation if installed (uvloop has no Windows build)."""
+    return impl if importlib.util.find_spec(impl) is not None else "auto"
+
+def _index_kb() -> None:
+    """
+    Index the KB once in the parent process, before workers are forked.
+
+    Each worker's warm-up only indexes an empty collection; without this, N workers
+    starting on a fresh persist dir would all see it empty and index it N times
+    (duplicate chunks, concurrent writers on one Chroma directory).
+    """
+    try:
+        from cob_demo_agent.sre.rag_agent.vectorstore import build_vector_store
+        build_vector_store()
+    except Exception:
+        # Workers retry on warm-up / first request; keep the reason in the logs.
+        logger.exception("[startup] KB indexing failed")
+
+def main() -> None:
+    """
+    Serve the API with N pre-forked uvicorn workers (one event loop per core).
+
+    Environment:
+    - COB_WORKERS / WEB_CONCURRENCY: worker count (default: CPU count)
+    - COB_HOST / COB_PORT: bind address (default: 127.0.0.1:8000)
+    """
+    import uvicorn
+
+    workers = int(get_env("COB_WORKERS") or get_env("WEB_CONCURRENCY") or os.cpu_count() or 1)
+    _index_kb()
+    uvicorn.run(
+        "main_api:app",
+        host=get_env("COB_HOST", "127.0.0.1") or "127.0.0.1",
+        port=int(get_env("COB_PORT", "8000") or "8000"),
+        workers=workers,
+        loop=_fast_or_auto("uvloop"),
+        http=_fast_or_auto("httptools"),
+        access_log=False,  # request/response logging is done by the app itself
+    )
+
+if __name__ == "__main__":
+    main()
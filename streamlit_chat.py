@@ -3,10 +3,10 @@ Streamlit Chat UI for COB Demo Agent (FastAPI backend).
 
 Features:
 - Wide + Dark UI (CSS)
-- Session-scoped random thread_id (6 digits)
+- Session-scoped random thread_id (12 hex chars, from `secrets`)
 - Chat-like interface using st.chat_message/st.chat_input
 - Sends: {message, thread_id}
-- Displays: reply only
+- Displays: reply only, streamed over SSE unless COB_BACKEND_STREAM=0
 - If handoff_required == True:
   - Show last AI reply
   - Lock chat input (stop conversation)
@@ -15,11 +15,17 @@ Features:
 
 from __future__ import annotations
 
+import concurrent.futures as cf
 import os
-import random
-import requests
+import time
+import orjson
 import streamlit as st
-from typing import Dict, Any
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Any, Iterator
+
+if TYPE_CHECKING:  # requests (urllib3, ssl, ...) is imported lazily in _http()
+    import requests
 
 
 # =========================
@@ -89,7 +95,14 @@ textarea, input {
 }
 </style>
 """
-st.markdown(DARK_CSS, unsafe_allow_html=True)
+# st.html skips the markdown parser. Not behind a one-shot flag: a full rerun that
+# skipped it would drop the styles. Chat turns rerun the full app (the input lives
+# at top level), so the stylesheet is re-emitted each turn; only New Chat is scoped
+# to the chat_ui fragment.
+st.html(DARK_CSS)
+
+# Handoff banner shown under the flagged assistant reply.
+_FLAG_HTML = '<div class="cob-flag">🚩 Handoff required — chat is paused and needs human assistance.</div>'
 
 
 # =========================
@@ -98,21 +111,95 @@ st.markdown(DARK_CSS, unsafe_allow_html=True)
 # Example: http://127.0.0.1:8000/api/chat
 BACKEND_CHAT_URL = os.getenv("COB_BACKEND_CHAT_URL", "http://127.0.0.1:8000/api/chat")
 
+# Example: http://127.0.0.1:8000/api/chat/stream (Server-Sent Events)
+BACKEND_STREAM_URL = os.getenv("COB_BACKEND_STREAM_URL", BACKEND_CHAT_URL.rstrip("/") + "/stream")
+
+# Stream replies over SSE; set COB_BACKEND_STREAM=0 to use the blocking endpoint.
+BACKEND_STREAM = os.getenv("COB_BACKEND_STREAM", "1").strip().lower() not in ("0", "false", "no")
+
+# Chat turns (user message + reply) kept per session; older turns are dropped.
+MAX_TURNS = int(os.getenv("COB_MAX_TURNS") or "100")
+
+# (connect, read) timeouts: fail fast on connect, allow slow LLM replies.
+BACKEND_TIMEOUT = (5, 120)
+# Read timeout applies between chunks when streaming, so it can be more generous.
+BACKEND_STREAM_TIMEOUT = (5, 300)
+
+
+@st.cache_resource
+def _http() -> requests.Session:
+    """
+    Shared keep-alive HTTP session (one per Streamlit server, across reruns/users).
+
+    Reuses TCP/TLS connections to the backend instead of a new handshake per turn.
+    Only connection errors are retried (read=0): a chat turn that reached the
+    backend is never sent twice.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, read=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def _backend() -> Dict[str, Any]:
+    """
+    Resolved backend endpoint shared by all reruns/users: session, URL and static headers.
+
+    Connection-level constants only — never put per-user data here.
+    """
+    return {
+        "session": _http(),
+        "url": BACKEND_CHAT_URL,
+        "stream_url": BACKEND_STREAM_URL,
+        "headers": {"Accept": "application/json"},
+    }
+
+
+def new_thread_id() -> str:
+    """Random conversation id: 48 bits, so concurrent sessions do not collide."""
+    import secrets
+
+    return secrets.token_hex(6)
+
+
+@dataclass(slots=True)
+class Msg:
+    """One chat bubble kept in session state."""
+
+    role: str  # "user" | "assistant"
+    content: str
+    flag: bool = False  # handoff banner; only ever set on assistant replies
+
+
+def new_history() -> deque:
+    """Empty, bounded chat history: memory and render cost stay flat on long chats."""
+    return deque(maxlen=2 * MAX_TURNS)  # two messages per turn
+
 
 def ensure_session_state() -> None:
     """Initialize session state keys used by the UI."""
     if "thread_id" not in st.session_state:
-        st.session_state.thread_id = str(random.randint(100000, 999999))  # 6 digits -> str
+        st.session_state.thread_id = new_thread_id()
 
     if "messages" not in st.session_state:
-        # Each item: {"role": "user"|"assistant", "content": "...", "flag": bool}
-        st.session_state.messages = []
+        # Each item: Msg(role, content, flag)
+        st.session_state.messages = new_history()
 
     if "handoff_locked" not in st.session_state:
         st.session_state.handoff_locked = False
 
 
-def call_backend(message: str, thread_id: str) -> Dict[str, Any]:
+def call_backend(message: str, thread_id: str, backend: Dict[str, Any] | None = None) -> Dict[str, Any]:
     """
     Call FastAPI backend /api/chat.
 
@@ -120,19 +207,90 @@ def call_backend(message: str, thread_id: str) -> Dict[str, Any]:
       {"message": "...", "thread_id": "..."}
     Response expected:
       {"reply": "...", "route": "...", "handoff_required": bool, "handoff_reason": str, ...}
+
+    Pass `backend` (from _backend()) when calling off the script thread.
     """
+    b = backend or _backend()
     payload = {"message": message, "thread_id": thread_id}
-    resp = requests.post(BACKEND_CHAT_URL, json=payload, timeout=120)
+    resp = b["session"].post(b["url"], json=payload, headers=b["headers"], timeout=BACKEND_TIMEOUT)
 
     # Raise nice error if backend returns non-2xx
     if not resp.ok:
         try:
-            detail = resp.json()
+            detail = orjson.loads(resp.content)
         except Exception:
             detail = {"raw": resp.text}
         raise RuntimeError(f"Backend error ({resp.status_code}): {detail}")
 
-    return resp.json()
+    return orjson.loads(resp.content)
+
+
+@st.cache_resource
+def _pool() -> cf.ThreadPoolExecutor:
+    """Shared worker threads for blocking backend calls (non-streaming mode)."""
+    return cf.ThreadPoolExecutor(max_workers=8, thread_name_prefix="cob-backend")
+
+
+def call_backend_with_progress(message: str, thread_id: str) -> Dict[str, Any]:
+    """
+    Run call_backend() in a worker thread, showing a typing indicator until it returns.
+
+    The indicator is only re-sent when the elapsed-seconds counter changes.
+    """
+    b = _backend()  # resolve the cached resource on the script thread
+    fut = _pool().submit(call_backend, message, thread_id, b)
+    placeholder = st.empty()
+    shown = -1
+    start = time.monotonic()
+    while not fut.done():
+        elapsed = int(time.monotonic() - start)
+        if elapsed != shown:
+            placeholder.markdown(f"⏳ _thinking… {elapsed}s_")
+            shown = elapsed
+        time.sleep(0.1)
+    placeholder.empty()
+    return fut.result()
+
+
+def stream_backend(message: str, thread_id: str, result: Dict[str, Any]) -> Iterator[str]:
+    """
+    Call FastAPI backend /api/chat/stream and yield reply text as it arrives.
+
+    Events (SSE):
+      token -> {"text": "..."}          yielded to the caller
+      done  -> same dict as /api/chat   stored into `result`
+      error -> {"error", "message"}     raised as RuntimeError
+    """
+    b = _backend()
+    payload = {"message": message, "thread_id": thread_id}
+    headers = {**b["headers"], "Accept": "text/event-stream"}
+    with b["session"].post(
+        b["stream_url"], json=payload, headers=headers, stream=True, timeout=BACKEND_STREAM_TIMEOUT
+    ) as resp:
+        if not resp.ok:
+            try:
+                detail = orjson.loads(resp.content)
+            except Exception:
+                detail = {"raw": resp.text}
+            raise RuntimeError(f"Backend error ({resp.status_code}): {detail}")
+
+        event = b"message"
+        # chunk_size=None: hand over data as soon as it arrives instead of filling 512-byte blocks.
+        # Lines stay bytes: orjson parses them directly, no intermediate str decode.
+        for line in resp.iter_lines(chunk_size=None):
+            if line.startswith(b"event: "):
+                event = line[7:]
+            elif line.startswith(b"data: "):
+                data = orjson.loads(line[6:])
+                if event == b"token":
+                    yield data.get("text", "")
+                elif event == b"done":
+                    result.update(data)
+                    return
+                elif event == b"error":
+                    raise RuntimeError(f"Backend error ({data.get('error')}): {data.get('message')}")
+
+    raise RuntimeError("Backend stream ended before the reply was complete.")
 
 
 # =========================
@@ -141,72 +299,109 @@ def call_backend(message: str, thread_id: str) -> Dict[str, Any]:
 ensure_session_state()
 
 st.title("💬 COB Demo Agent")
-st.caption(f"thread_id: `{st.session_state.thread_id}`  |  backend: `{BACKEND_CHAT_URL}`")
-
-# Optional: small reset button
-col1, col2, col3 = st.columns([1, 1, 6])
-with col1:
-    if st.button("🔄 New Chat", use_container_width=True):
-        st.session_state.thread_id = str(random.randint(100000, 999999))
-        st.session_state.messages = []
-        st.session_state.handoff_locked = False
-        st.rerun()
+
+
+def reset_chat() -> None:
+    """New Chat: fresh thread_id and empty history (button callback, runs before the rerun)."""
+    st.session_state.thread_id = new_thread_id()
+    st.session_state.messages = new_history()
+    st.session_state.handoff_locked = False
 
 
 # =========================
-# Render chat history
+# Chat area (fragment)
 # =========================
-for m in st.session_state.messages:
-    with st.chat_message(m["role"]):
-        st.markdown(m["content"])
+@st.fragment
+def chat_ui() -> None:
+    """
+    Render thread info, the New Chat button, chat history and the current turn.
 
-        # Red flag under AI message when handoff triggers
-        if m.get("flag", False) and m["role"] == "assistant":
-            st.markdown(
-                '<div class="cob-flag">🚩 Handoff required — chat is paused and needs human assistance.</div>',
-                unsafe_allow_html=True,
-            )
+    Runs as a fragment: clicking New Chat reruns only this function, not the CSS
+    injection and title above it. The chat input itself lives outside (see below)
+    and hands submissions over via st.session_state.pending_input.
+    """
+    st.caption(f"thread_id: `{st.session_state.thread_id}`  |  backend: `{BACKEND_CHAT_URL}`")
 
+    # Optional: small reset button
+    col1, col2, col3 = st.columns([1, 1, 6])
+    with col1:
+        st.button("🔄 New Chat", use_container_width=True, on_click=reset_chat)
 
-# =========================
-# Chat input (locked on handoff)
-# =========================
-if st.session_state.handoff_locked:
-    st.info("Chat is paused because the system requested a handoff. Start a New Chat to begin a fresh conversation.")
-    st.stop()
+    # Render chat history
+    for m in st.session_state.messages:
+        with st.chat_message(m.role):
+            st.markdown(m.content)
 
-user_text = st.chat_input("Type your message here...")
+            # Red flag under AI message when handoff triggers
+            if m.flag:
+                st.html(_FLAG_HTML)
 
-if user_text:
-    # 1) Show user message
-    st.session_state.messages.append({"role": "user", "content": user_text})
-    with st.chat_message("user"):
-        st.markdown(user_text)
+    # Chat input is locked on handoff
+    if st.session_state.handoff_locked:
+        st.info("Chat is paused because the system requested a handoff. Start a New Chat to begin a fresh conversation.")
 
-    # 2) Call backend and show assistant reply
-    try:
-        data = call_backend(user_text, st.session_state.thread_id)
-        reply = (data.get("reply") or "").strip()
-        handoff_required = bool(data.get("handoff_required", False))
+    user_text = st.session_state.pop("pending_input", None)
 
-        # We display reply only (as requested)
-        st.session_state.messages.append(
-            {"role": "assistant", "content": reply or "_(no reply)_", "flag": handoff_required}
-        )
+    if user_text and not st.session_state.handoff_locked:
+        # New bubbles are drawn here, after the history and above the pinned input,
+        # so the reply can stream into its bubble. They are also appended to the
+        # history, which draws them on later runs: one render per message per run,
+        # with no extra rerun after each turn.
 
+        # 1) Show user message
+        st.session_state.messages.append(Msg("user", user_text))
+        with st.chat_message("user"):
+            st.markdown(user_text)
+
+        # 2) Call backend and show assistant reply (streamed in place when enabled)
         with st.chat_message("assistant"):
-            st.markdown(reply or "_(no reply)_")
-
-            if handoff_required:
-                st.markdown(
-                    '<div class="cob-flag">🚩 Handoff required — chat is paused and needs human assistance.</div>',
-                    unsafe_allow_html=True,
-                )
-                st.session_state.handoff_locked = True
-
-    except Exception as e:
-        # Show an error message bubble
-        err_text = f"❌ An error occurred while connecting to the backend:\n\n{e}"
-        st.session_state.messages.append({"role": "assistant", "content": err_text, "flag": False})
-        with st.chat_message("assistant"):
-            st.markdown(err_text)
+            slot = st.empty()
+            try:
+                if BACKEND_STREAM:
+                    data: Dict[str, Any] = {}
+                    with slot.container():
+                        streamed = st.write_stream(stream_backend(user_text, st.session_state.thread_id, data))
+                else:
+                    data = call_backend_with_progress(user_text, st.session_state.thread_id)
+                    streamed = ""
+                reply = (data.get("reply") or "").strip() or "_(no reply)_"
+                handoff_required = bool(data.get("handoff_required", False))
+
+                # We display reply only (as requested)
+                st.session_state.messages.append(Msg("assistant", reply, handoff_required))
+
+                # The final reply is authoritative: replace the streamed text if it differs,
+                # so the bubble does not change on the next rerun.
+                if streamed != reply:
+                    slot.markdown(reply)
+
+                if handoff_required:
+                    # The flag is drawn by the history loop on the app rerun at the end.
+                    st.session_state.handoff_locked = True
+
+            except Exception as e:
+                # Show an error message bubble
+                err_text = f"❌ An error occurred while connecting to the backend:\n\n{e}"
+                st.session_state.messages.append(Msg("assistant", err_text))
+                slot.markdown(err_text)
+
+    # The input is rendered outside this fragment: when it no longer matches the
+    # lock (handoff just triggered, or New Chat cleared one), rerun the whole app.
+    if st.session_state.input_shown == st.session_state.handoff_locked:
+        st.rerun()
+
+
+# =========================
+# Chat input (top level)
+# =========================
+# Kept outside the fragment: inside it, chat_input sits in the fragment's container
+# and renders inline instead of pinned to the bottom. A submission reruns the app;
+# it is passed on through session state, not as a fragment argument (arguments are
+# replayed on fragment-only reruns, which would resend the message).
+st.session_state.input_shown = not st.session_state.handoff_locked
+if st.session_state.input_shown:
+    submitted = st.chat_input("Type your message here...")
+    if submitted:
+        st.session_state.pending_input = submitted
+
+chat_ui()